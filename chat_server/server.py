@@ -2,18 +2,34 @@
 
 import grpc
 import time
-import concurrent.futures
-import threading
+import asyncio
 import collections
+import itertools
 import json
+import logging
 import os
-import firebase_admin
-from firebase_admin import credentials, firestore, auth
+import signal
 
 # Import the generated gRPC and protobuf files
 import chat_pb2
 import chat_pb2_grpc
 
+# The Firebase/Firestore stack (firebase_admin, google.cloud, a second copy
+# of the gRPC core) is imported lazily in initialize_firebase() so the
+# default in-memory backend never pays its import time or resident memory.
+# These names are populated there.
+firebase_admin = None
+credentials = None
+firestore = None
+firestore_async = None
+auth = None
+DatetimeWithNanoseconds = None
+
+# Which storage backend serves this process: the in-memory store (default,
+# no external dependencies) or Firestore. One module means one import cost
+# and no risk of wiring up the wrong servicer copy.
+BACKEND = os.environ.get("CHAT_BACKEND", "memory")
+
 # Global variables provided by the Canvas environment for Firebase
 # These will be populated at runtime.
 # Use os.environ.get to safely access environment variables
@@ -21,81 +37,410 @@ app_id = os.environ.get('__app_id', 'default-app-id')
 firebase_config_str = os.environ.get('__firebase_config', '{}')
 initial_auth_token = os.environ.get('__initial_auth_token', None)
 
-db = None # Firestore client
+db = None # Firestore client (blocking; used for queries and the watcher)
+db_async = None # Async Firestore client, used on the write path so many
+                # in-flight writes can overlap on the event loop
 auth_client = None # Firebase Auth client
 
-# Condition variable to notify streaming clients about new messages.
-# This is still used for immediate notification within the server process,
-# but Firestore's on_snapshot is the primary real-time mechanism.
-_MESSAGE_CONDITION = threading.Condition()
+# Round-robin cycle of async write clients. Each client owns its own gRPC
+# channel, so spreading writes across CHAT_FIRESTORE_POOL of them (default 4)
+# keeps one HTTP/2 channel from becoming the funnel for every write.
+_write_clients = None
+
+logger = logging.getLogger(__name__)
+
+# How many queued messages a streamer drains per wakeup. Batching them into
+# one pass amortizes the per-get bookkeeping when messages arrive in bursts.
+PREFETCH_SIZE = 50
+
+# How long a streamer blocks on its queue before re-checking that the client
+# is still connected. This is purely a liveness poll — delivery latency is
+# unaffected because a put wakes the get immediately — so it is kept long to
+# avoid needless wakeups on idle streams.
+STREAM_POLL_SECONDS = 15
+
+# Ring-buffer capacity of the in-memory store. Appends are O(1) and the
+# oldest messages are evicted automatically, so memory stays bounded no
+# matter how long the server runs.
+MESSAGE_CAPACITY = 10_000
 
-# A dictionary to hold queues for each active streaming client
-# This allows us to push new messages to specific clients from Firestore snapshots.
-_CLIENT_QUEUES = collections.defaultdict(collections.deque)
+# Upper bound on a streaming client's undelivered-message queue. A consumer
+# that falls this far behind is cut loose (its stream ends and the client
+# reconnects) instead of buffering an unbounded backlog in server memory.
+CLIENT_QUEUE_CAPACITY = 2048
 
 # Firestore collection path for public chat messages
 # Using __app_id to ensure unique collections per Canvas app instance
 PUBLIC_CHAT_COLLECTION = f"artifacts/{app_id}/public/data/chat_messages"
 
+# Shared channel options: keepalive pings detect and prune dead streaming
+# clients instead of waiting on a TCP RST, and the stream cap is raised so
+# many chat clients can share one connection.
+_SERVER_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.max_concurrent_streams', 1000),
+    # Explicitly opt in to SO_REUSEPORT so CHAT_PROCESSES > 1 workers can
+    # all bind port 50051 and let the kernel spread connections over them.
+    ('grpc.so_reuseport', 1),
+]
+
+def _build_write_client_pool():
+    """
+    Builds the round-robin cycle of async Firestore clients used for writes.
+    The admin SDK caches one client per app, so additional clients (and
+    therefore additional channels) are created directly against the app's
+    credentials. Falls back to cycling the single cached client if that
+    is not possible (e.g. emulator credentials).
+    """
+    pool_size = max(1, int(os.environ.get("CHAT_FIRESTORE_POOL", "4")))
+    clients = [db_async]
+    try:
+        from google.cloud import firestore as gc_firestore
+        app = firebase_admin.get_app()
+        cred = app.credential.get_credential()
+        for _ in range(pool_size - 1):
+            clients.append(gc_firestore.AsyncClient(project=app.project_id, credentials=cred))
+    except Exception as e:
+        logger.warning("Could not build Firestore write-client pool, using a single channel: %s", e)
+    return itertools.cycle(clients)
+
+
 def initialize_firebase():
     """Initializes Firebase Admin SDK."""
-    global db, auth_client
+    global db, db_async, auth_client, _write_clients
+    global firebase_admin, credentials, firestore, firestore_async, auth
+    global DatetimeWithNanoseconds
+
+    # Deferred imports: only the Firestore backend ever reaches this point.
+    import firebase_admin
+    from firebase_admin import credentials, firestore, firestore_async, auth
+    from google.api_core.datetime_helpers import DatetimeWithNanoseconds
 
     # Check if Firebase is already initialized to prevent re-initialization errors
     if firebase_admin._apps:
-        print("Firebase already initialized.")
+        logger.info("Firebase already initialized.")
         db = firestore.client()
+        db_async = firestore_async.client()
+        _write_clients = _build_write_client_pool()
         auth_client = auth.Client(firebase_admin.get_app())
         return
 
     try:
         firebase_config = {}
-        print(f"DEBUG: Raw __firebase_config_str: {firebase_config_str}") # DEBUG PRINT
+        logger.debug("Raw __firebase_config_str: %s", firebase_config_str)
 
         if firebase_config_str:
             try:
                 firebase_config = json.loads(firebase_config_str)
             except json.JSONDecodeError:
-                print("Warning: __firebase_config is not a valid JSON string. Attempting default initialization.")
-        
-        print(f"DEBUG: Parsed firebase_config: {firebase_config}") # DEBUG PRINT
+                logger.warning("__firebase_config is not a valid JSON string. Attempting default initialization.")
+
+        logger.debug("Parsed firebase_config: %s", firebase_config)
 
         # Attempt to initialize with service account credentials if valid config is provided
         if firebase_config and firebase_config.get("type") == "service_account":
             cred = credentials.Certificate(firebase_config)
             firebase_admin.initialize_app(cred)
-            print("Firebase initialized using service account credentials.")
+            logger.info("Firebase initialized using service account credentials.")
         else:
             # Fallback to default credentials (e.g., when running in a Google Cloud environment
             # with Application Default Credentials set up, or if the service account JSON is invalid).
-            print("Attempting Firebase initialization with default credentials (no valid service account JSON provided).")
+            logger.info("Attempting Firebase initialization with default credentials (no valid service account JSON provided).")
             firebase_admin.initialize_app()
 
         db = firestore.client()
+        db_async = firestore_async.client()
+        _write_clients = _build_write_client_pool()
         auth_client = auth.Client(firebase_admin.get_app())
-        print("Firestore client and Auth client initialized.")
+        logger.info("Firestore client and Auth client initialized.")
 
     except Exception as e:
-        print(f"Critical Error initializing Firebase: {e}")
+        logger.error("Critical Error initializing Firebase: %s", e)
         # If initialization fails, db and auth_client will remain None,
         # and subsequent database operations will correctly report "Database not ready."
         pass
 
 
-class ChatServiceServicer(chat_pb2_grpc.ChatServiceServicer):
+def _to_msg(doc_data, _MSG=chat_pb2.ChatMessage):
+    """
+    Builds a ChatMessage from a Firestore document dict. This runs once per
+    document on the history and snapshot paths, so it keeps the per-doc work
+    to a couple of dict lookups and one isinstance check.
+    DatetimeWithNanoseconds is a module global populated by
+    initialize_firebase(), which always runs before any document exists to
+    convert.
+    """
+    ts = doc_data.get('timestamp')
+    if isinstance(ts, DatetimeWithNanoseconds): # Firestore server timestamps come back as datetimes
+        ts = int(ts.timestamp())
+    else:
+        ts = int(ts) if ts is not None else time.time_ns() // 1_000_000_000
+    return _MSG(
+        sender=doc_data.get('sender') or 'Unknown',
+        content=doc_data.get('content') or '',
+        timestamp=ts
+    )
+
+
+class InMemoryChatServiceServicer(chat_pb2_grpc.ChatServiceServicer):
+    """
+    Implementation of the gRPC ChatService using in-memory storage.
+    """
+
+    def __init__(self):
+        # The store holds chat_pb2.ChatMessage objects directly: they are
+        # never mutated after construction, so history replays and the
+        # streaming fan-out all share the same instance instead of
+        # rebuilding one protobuf per subscriber. The bounded deque evicts
+        # the oldest message on append once MESSAGE_CAPACITY is reached.
+        self._messages = collections.deque(maxlen=MESSAGE_CAPACITY)
+        # One asyncio queue per active streaming client. SendMessage pushes
+        # new messages directly into each queue, so streamers park in await
+        # with no polling. Everything here runs on the one event loop, so no
+        # lock is needed around the store or the registry — the coroutines
+        # never touch them across an await point.
+        self._client_queues = {}
+        # Content -> list of live messages with that content. DeleteMessage
+        # looks its target up here and tombstones it, instead of rebuilding
+        # the whole 10k-entry deque per delete. Maintained on append and
+        # eviction; readers skip tombstones via _is_live.
+        self._by_content = {}
+        # Identities of tombstoned (deleted) messages. An explicit set
+        # rather than clearing fields in place: an all-empty message is
+        # legal at the gRPC layer, and the stored protobufs stay immutable.
+        # An id() stays valid because the object it names lives in the
+        # deque until eviction, which discards the entry.
+        self._deleted = set()
+
+    def _is_live(self, msg):
+        """A tombstoned (deleted) message stays in the ring buffer until
+        eviction; readers skip it."""
+        return id(msg) not in self._deleted
+
+    async def SendMessage(self, request, context):
+        """
+        Handles unary RPC for sending a single message.
+        Saves the message to in-memory storage.
+        """
+        # Create the ChatMessage once; the store and every client queue
+        # share this same instance. It is never rewritten for reuse — a
+        # streamer parked in a flow-controlled yield (or an evicted slow
+        # consumer still draining its queue) can hold a reference across
+        # arbitrarily many later sends, so recycling objects in place
+        # would silently swap its message out from under it. The server's
+        # clock is authoritative — any client-supplied timestamp is
+        # ignored — and time_ns avoids the float round-trip of time.time().
+        chat_message = chat_pb2.ChatMessage(
+            sender=request.message.sender,
+            content=request.message.content,
+            timestamp=time.time_ns() // 1_000_000_000
+        )
+        if len(self._messages) == MESSAGE_CAPACITY:
+            # The full ring buffer is about to evict its oldest message;
+            # drop it from the content index first.
+            evicted = self._messages.popleft()
+            self._deleted.discard(id(evicted))
+            bucket = self._by_content.get(evicted.content)
+            if bucket:
+                try:
+                    bucket.remove(evicted)
+                except ValueError:
+                    pass
+                if not bucket:
+                    del self._by_content[evicted.content]
+        self._messages.append(chat_message)
+        self._by_content.setdefault(chat_message.content, []).append(chat_message)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Message stored: %s: %s", chat_message.sender, chat_message.content)
+
+        # Push it to every streaming client's queue. put_nowait wakes the
+        # awaiting coroutine on this same loop; no broadcast needed. A full
+        # queue marks a consumer too slow to keep; evicting it from the
+        # registry ends its stream the next time it wakes.
+        for client_id, client_queue in list(self._client_queues.items()):
+            try:
+                client_queue.put_nowait(chat_message)
+            except asyncio.QueueFull:
+                self._client_queues.pop(client_id, None)
+                logger.warning("Dropping slow streaming client %s (queue full)", client_id)
+
+        return chat_pb2.SendMessageResponse()
+
+    async def StreamMessages(self, request, context):
+        """
+        Handles server-streaming RPC for real-time message updates.
+        Uses in-memory storage and asyncio for real-time updates.
+        """
+        peer = context.peer()
+        logger.info("Client %s connected for message streaming.", peer)
+
+        # Create a queue for this specific client. SendMessage pushes new
+        # messages into it directly, so we can await get() below. The
+        # registry is keyed by id(context) — peer() is a formatted string
+        # that costs a grpc-core call plus a string hash per lookup, and is
+        # only worth producing for the log lines.
+        client_id = id(context)
+        client_queue = asyncio.Queue(maxsize=CLIENT_QUEUE_CAPACITY)
+        self._client_queues[client_id] = client_queue
+
+        # Snapshot existing messages (last 10) before the first await, then
+        # replay. The stored messages are yielded as-is — no per-client
+        # reconstruction. Tombstoned (deleted) messages are skipped.
+        start = max(0, len(self._messages) - 10)
+        recent_messages = tuple(
+            msg for msg in itertools.islice(self._messages, start, None)
+            if self._is_live(msg))
+
+        try:
+            for msg in recent_messages:
+                yield msg
+
+            # Await the queue for new messages. The aio context exposes
+            # cancelled(), not the threaded API's is_active(); grpc.aio
+            # also cancels this coroutine outright on client disconnect,
+            # so the poll timeout is just a backstop for the eviction
+            # check. Once one message arrives, opportunistically drain
+            # whatever else is queued so a burst goes out in one batch.
+            while not context.cancelled():
+                if self._client_queues.get(client_id) is not client_queue:
+                    # Evicted by the fan-out as a slow consumer; end the
+                    # stream so the client reconnects with a fresh replay.
+                    break
+                try:
+                    pending = [await asyncio.wait_for(
+                        client_queue.get(), timeout=STREAM_POLL_SECONDS)]
+                except asyncio.TimeoutError:
+                    continue
+                try:
+                    while len(pending) < PREFETCH_SIZE:
+                        pending.append(client_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    pass
+                for msg in pending:
+                    # Skip messages deleted while they sat in the queue.
+                    if self._is_live(msg):
+                        yield msg
+
+        finally:
+            # Clean up: remove the client's queue when the client disconnects
+            self._client_queues.pop(client_id, None)
+            logger.info("Client %s disconnected from streaming.", peer)
+
+    async def GetMessageHistory(self, request, context):
+        """
+        Handles unary RPC for getting a limited number of past messages.
+        """
+        # Get the latest 'limit' messages; the stored ChatMessages are
+        # reused directly in the response. islice allocates only the
+        # requested window (and handles limit <= 0 and short stores
+        # without a branch). Tombstones are filtered out after slicing, so
+        # a window containing deletions can come back slightly short.
+        start = max(0, len(self._messages) - request.limit)
+        messages_to_send = [
+            msg for msg in itertools.islice(self._messages, start, None)
+            if self._is_live(msg)]
+
+        return chat_pb2.GetMessageHistoryResponse(messages=messages_to_send)
+
+    async def DeleteMessage(self, request, context):
+        """
+        Handles unary RPC for deleting a message.
+        For simplicity, delete by content match.
+        """
+        # Look the matching messages up in the content index and tombstone
+        # them — O(matches) instead of rebuilding the whole ring buffer.
+        # The objects stay in the deque until eviction drops them; every
+        # reader skips tombstones.
+        bucket = self._by_content.pop(request.message_id, None)
+        deleted_count = len(bucket) if bucket else 0
+        if bucket:
+            for msg in bucket:
+                self._deleted.add(id(msg))
+
+        if deleted_count > 0:
+            logger.info("Deleted %d message(s) with content '%s'", deleted_count, request.message_id)
+            return chat_pb2.DeleteMessageResponse(
+                success=True,
+                message=f"Deleted {deleted_count} message(s) with content '{request.message_id}'"
+            )
+        else:
+            return chat_pb2.DeleteMessageResponse(
+                success=False,
+                message=f"No messages found with content '{request.message_id}'"
+            )
+
+
+class FirestoreChatServiceServicer(chat_pb2_grpc.ChatServiceServicer):
     """
     Implements the gRPC ChatService.
     Handles sending, streaming, getting history, and deleting chat messages
     with Firestore as the backend.
     """
 
-    def SendMessage(self, request, context):
+    def __init__(self):
+        # One asyncio queue per active streaming client. The Firestore
+        # snapshot callback pushes new messages into these from its own
+        # thread via the event loop, so the streaming coroutines just await
+        # them.
+        self._client_queues = {}
+        # One shared Firestore watcher feeds every streaming client, instead
+        # of each client installing (and paying for) its own collection
+        # listener. New clients are brought up to date from this cache of
+        # the most recent messages.
+        self._recent_messages = collections.deque(maxlen=100)
+        self._chat_watcher = None
+
+    def _dispatch_docs(self, doc_datas):
+        """
+        Runs on the event loop: converts a batch of Firestore document dicts
+        into ChatMessages, caches them for late joiners and pushes each one
+        straight into every streaming client's queue. Keeping the conversion
+        and fan-out here means the SDK's single watch thread does nothing
+        but extract dicts, so it can keep up with the change feed no matter
+        how many clients are connected.
+        """
+        for doc_data in doc_datas:
+            chat_message = _to_msg(doc_data)
+            self._recent_messages.append(chat_message)
+            for client_id, client_queue in list(self._client_queues.items()):
+                try:
+                    client_queue.put_nowait(chat_message)
+                except asyncio.QueueFull:
+                    # Too far behind to keep; evicting it from the registry
+                    # ends its stream the next time it wakes.
+                    self._client_queues.pop(client_id, None)
+                    logger.warning("Dropping slow streaming client %s (queue full)", client_id)
+
+    def _ensure_chat_watcher(self, loop):
+        """
+        Installs the single shared Firestore listener on first use. Its
+        callback runs on Firestore's watch thread, so it hands the raw
+        document data over to the event loop in one hop rather than
+        building messages or touching the client queues itself.
+        """
+        if self._chat_watcher is not None:
+            return
+
+        def on_snapshot(col_snapshot, changes, read_time):
+            doc_datas = [change.document.to_dict()
+                         for change in changes if change.type.name == 'ADDED']
+            if doc_datas:
+                loop.call_soon_threadsafe(self._dispatch_docs, doc_datas)
+
+        # Order by timestamp and limit to last 100 for the initial sync.
+        query_ref = db.collection(PUBLIC_CHAT_COLLECTION).order_by('timestamp').limit_to_last(100)
+        self._chat_watcher = query_ref.on_snapshot(on_snapshot)
+
+    async def SendMessage(self, request, context):
         """
         Handles unary RPC for sending a single message.
         Saves the message to Firestore.
         """
         if not db:
-            print("Firestore not initialized. Cannot send message.")
+            logger.warning("Firestore not initialized. Cannot send message.")
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details("Database not ready.")
             return chat_pb2.SendMessageResponse()
@@ -106,193 +451,250 @@ class ChatServiceServicer(chat_pb2_grpc.ChatServiceServicer):
             "timestamp": firestore.SERVER_TIMESTAMP # Use server timestamp for accuracy
         }
         try:
-            # Add message to Firestore. doc_ref is a tuple (update_time, DocumentReference)
-            doc_ref = db.collection(PUBLIC_CHAT_COLLECTION).add(message_data)
-            print(f"Message saved to Firestore with ID: {doc_ref[1].id}")
+            # Await the next async client in the write pool: single writes
+            # stay non-atomic (no batch two-phase commit) while the event
+            # loop overlaps any number of them in flight across the pooled
+            # channels.
+            # doc_ref is a tuple (update_time, DocumentReference).
+            db_write = next(_write_clients)
+            doc_ref = await db_write.collection(PUBLIC_CHAT_COLLECTION).add(message_data)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Message saved to Firestore with ID: %s", doc_ref[1].id)
 
             # Note: The actual message with server timestamp will be streamed back
             # by the StreamMessages listener. We don't need to manually notify here
-            # for the in-memory queue as Firestore's on_snapshot handles propagation.
-            return chat_pb2.SendMessageResponse()
+            # as Firestore's on_snapshot handles propagation.
+            # Return the document ID so clients can address this message later
+            # (e.g. for DeleteMessage).
+            return chat_pb2.SendMessageResponse(message_id=doc_ref[1].id)
         except Exception as e:
-            print(f"Error saving message to Firestore: {e}")
+            logger.error("Error saving message to Firestore: %s", e)
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Failed to save message: {e}")
             return chat_pb2.SendMessageResponse()
 
-    def StreamMessages(self, request, context):
+    async def StreamMessages(self, request, context):
         """
         Handles server-streaming RPC for real-time message updates from Firestore.
         Uses Firestore's on_snapshot listener to stream new messages.
         """
         if not db:
-            print("Firestore not initialized. Cannot stream messages.")
+            logger.warning("Firestore not initialized. Cannot stream messages.")
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details("Database not ready.")
             return
 
-        client_id = context.peer()
-        print(f"Client {client_id} connected for message streaming.")
+        peer = context.peer()
+        logger.info("Client %s connected for message streaming.", peer)
 
-        # Create a queue for this specific client
-        client_queue = collections.deque()
-        _CLIENT_QUEUES[client_id] = client_queue
-
-        # Callback for Firestore snapshot listener
-        def on_snapshot(col_snapshot, changes, read_time):
-            """
-            This callback is executed whenever there's a change in the collection.
-            It processes new messages and adds them to the client's queue.
-            """
-            for change in changes:
-                if change.type.name == 'ADDED':
-                    doc_data = change.document.to_dict()
-                    # Convert Firestore Timestamp object to Unix timestamp (int)
-                    timestamp = doc_data.get('timestamp')
-                    if hasattr(timestamp, 'timestamp'): # Check if it's a Firestore Timestamp object
-                        timestamp = int(timestamp.timestamp())
-                    else: # Fallback if for some reason it's not a Timestamp object
-                        timestamp = int(time.time()) if timestamp is None else int(timestamp)
-
-                    chat_message = chat_pb2.ChatMessage(
-                        sender=doc_data.get('sender', 'Unknown'),
-                        content=doc_data.get('content', ''),
-                        timestamp=timestamp
-                    )
-                    # Put the new message into this client's queue
-                    client_queue.append(chat_message)
-                    # Notify the waiting loop for this client that a new message is available
-                    with _MESSAGE_CONDITION:
-                        _MESSAGE_CONDITION.notify_all()
-
-        # Start listening to Firestore changes.
-        # Order by timestamp and limit to last 100 for initial sync.
-        query_ref = db.collection(PUBLIC_CHAT_COLLECTION).order_by('timestamp').limit_to_last(100)
-        query_watcher = query_ref.on_snapshot(on_snapshot)
+        # Make sure the shared collection watcher is running, then register a
+        # queue for this specific client. The broadcast runs on the event
+        # loop, so registration and fan-out never race. The registry is keyed
+        # by id(context); peer() is only formatted for the log lines.
+        loop = asyncio.get_running_loop()
+        self._ensure_chat_watcher(loop)
+        client_id = id(context)
+        client_queue = asyncio.Queue(maxsize=CLIENT_QUEUE_CAPACITY)
+        self._client_queues[client_id] = client_queue
 
         try:
-            # Continuously yield messages from this client's queue as they arrive
-            while context.is_active():
+            # Bring the new client up to date from the recent-message cache,
+            # then continuously yield messages from its queue as they arrive.
+            # The coroutine is parked in await with no polling; the timeout
+            # only exists to periodically re-check the connection.
+            # tuple() snapshots the small deque more cheaply than list() and
+            # makes the replay window immutable while we yield from it.
+            for msg in tuple(self._recent_messages):
+                yield msg
+
+            # The aio context exposes cancelled(), not the threaded API's
+            # is_active(); grpc.aio also cancels this coroutine outright on
+            # client disconnect, so the poll timeout is just a backstop for
+            # the eviction check below.
+            while not context.cancelled():
+                if self._client_queues.get(client_id) is not client_queue:
+                    # Evicted by the fan-out as a slow consumer; end the
+                    # stream so the client reconnects with a fresh replay.
+                    break
                 try:
-                    # Get a message from the queue. block=True waits until a message is available.
-                    # timeout=1 ensures we periodically check context.is_active() and prevent indefinite blocking.
-                    msg = client_queue.popleft() # Pop from the left (oldest message)
-                    yield msg
-                except IndexError:
-                    # Queue is empty, wait for a new message notification
-                    with _MESSAGE_CONDITION:
-                        _MESSAGE_CONDITION.wait(timeout=1) # Wait for 1 second, then re-check context status
-                except Exception as e:
-                    print(f"Error yielding message for client {client_id}: {e}")
-                    break # Break the loop if an unrecoverable error occurs in yielding
+                    msg = await asyncio.wait_for(client_queue.get(), timeout=STREAM_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    continue
+                yield msg
 
         finally:
-            # Clean up: remove the Firestore listener and the client's queue when the client disconnects
-            query_watcher.unsubscribe()
-            if client_id in _CLIENT_QUEUES:
-                del _CLIENT_QUEUES[client_id]
-            print(f"Client {client_id} disconnected from streaming. Firestore listener unsubscribed.")
+            # Clean up: drop the client's queue when it disconnects. The
+            # shared watcher stays subscribed for the other clients.
+            self._client_queues.pop(client_id, None)
+            logger.info("Client %s disconnected from streaming.", peer)
 
-
-    def GetMessageHistory(self, request, context):
+    async def GetMessageHistory(self, request, context):
         """
         Handles unary RPC for getting a limited number of past messages from Firestore.
         """
         if not db:
-            print("Firestore not initialized. Cannot get message history.")
+            logger.warning("Firestore not initialized. Cannot get message history.")
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details("Database not ready.")
             return chat_pb2.GetMessageHistoryResponse()
 
         messages_to_send = []
         try:
-            # Query Firestore for the latest 'limit' messages, ordered by timestamp descending
-            query = db.collection(PUBLIC_CHAT_COLLECTION).order_by('timestamp', direction=firestore.Query.DESCENDING).limit(request.limit)
-            docs = query.stream() # Get documents as a stream
+            # Query Firestore for the latest 'limit' messages. limit_to_last
+            # with ascending order returns them already oldest-first, the
+            # order history is displayed in, so no Python-side reverse is
+            # needed. The blocking query runs in the executor so the loop
+            # stays responsive. (Same pattern as the streaming initial sync.)
+            loop = asyncio.get_running_loop()
+            query = db.collection(PUBLIC_CHAT_COLLECTION).order_by('timestamp').limit_to_last(request.limit)
+            docs = await loop.run_in_executor(None, query.get)
 
             for doc in docs:
-                doc_data = doc.to_dict()
-                timestamp = doc_data.get('timestamp')
-                if hasattr(timestamp, 'timestamp'): # If it's a Firestore Timestamp object
-                    timestamp = int(timestamp.timestamp())
-                else:
-                    timestamp = int(timestamp) if timestamp is not None else int(time.time())
-
-                chat_message = chat_pb2.ChatMessage(
-                    sender=doc_data.get('sender', 'Unknown'),
-                    content=doc_data.get('content', ''),
-                    timestamp=timestamp
-                )
-                messages_to_send.append(chat_message)
-
-            # Reverse the list to have oldest messages first, which is typical for history display
-            messages_to_send.reverse()
+                messages_to_send.append(_to_msg(doc.to_dict()))
+
             return chat_pb2.GetMessageHistoryResponse(messages=messages_to_send)
         except Exception as e:
-            print(f"Error fetching message history from Firestore: {e}")
+            logger.error("Error fetching message history from Firestore: %s", e)
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Failed to fetch message history: {e}")
             return chat_pb2.GetMessageHistoryResponse()
 
-
-    def DeleteMessage(self, request, context):
+    async def DeleteMessage(self, request, context):
         """
         Handles unary RPC for deleting a message from Firestore.
-        (Requires a message_id, which in a real app would be the Firestore document ID).
-        For this example, we'll simulate deletion by content match.
+        message_id is the Firestore document ID returned by SendMessage, so
+        the delete is a direct O(1) document lookup rather than a collection
+        scan for matching content.
         """
         if not db:
-            print("Firestore not initialized. Cannot delete message.")
+            logger.warning("Firestore not initialized. Cannot delete message.")
             context.set_code(grpc.StatusCode.UNAVAILABLE)
             context.set_details("Database not ready.")
             return chat_pb2.DeleteMessageResponse(success=False, message="Database not ready.")
 
-        print(f"Received request to delete message with ID (content match): {request.message_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received request to delete message with document ID: %s", request.message_id)
         try:
-            # In a real system, you would pass the actual Firestore document ID from the client
-            # and use doc_ref = db.collection(...).document(request.message_id) followed by doc_ref.delete().
-            # For this simplified example, we'll try to find a message by content and delete the first match.
-            # This is NOT efficient or robust for real deletion.
-            query_to_delete = db.collection(PUBLIC_CHAT_COLLECTION).where('content', '==', request.message_id).limit(1)
-            docs_to_delete = query_to_delete.stream()
-
-            deleted_count = 0
-            for doc in docs_to_delete:
-                doc.reference.delete()
-                deleted_count += 1
-                print(f"Deleted message with content '{request.message_id}' (Firestore ID: {doc.id})")
-                break # Delete only the first match for this simple example
-
-            if deleted_count > 0:
-                return chat_pb2.DeleteMessageResponse(success=True, message=f"Message '{request.message_id}' deleted (simulated by content match).")
-            else:
-                return chat_pb2.DeleteMessageResponse(success=False, message=f"Message '{request.message_id}' not found for deletion by content.")
+            loop = asyncio.get_running_loop()
+            doc_ref = db.collection(PUBLIC_CHAT_COLLECTION).document(request.message_id)
+            await loop.run_in_executor(None, doc_ref.delete)
+            return chat_pb2.DeleteMessageResponse(success=True, message=f"Message '{request.message_id}' deleted.")
 
         except Exception as e:
-            print(f"Error deleting message from Firestore: {e}")
+            logger.error("Error deleting message from Firestore: %s", e)
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(f"Failed to delete message: {e}")
             return chat_pb2.DeleteMessageResponse(success=False, message=f"Failed to delete message: {e}")
 
 
+async def serve_async():
+    """
+    Starts the asyncio gRPC server with the backend selected by CHAT_BACKEND.
+    Both backends run on grpc.aio: the event loop multiplexes every stream,
+    so idle streaming clients no longer pin a worker thread each and there
+    is no thread pool to size.
+    """
+    if BACKEND == "firestore":
+        initialize_firebase() # Initialize Firebase before starting the server
+        servicer = FirestoreChatServiceServicer()
+    else:
+        servicer = InMemoryChatServiceServicer()
+
+    server = grpc.aio.server(options=_SERVER_OPTIONS)
+    chat_pb2_grpc.add_ChatServiceServicer_to_server(servicer, server)
+    server.add_insecure_port('[::]:50051') # Listen on all interfaces, port 50051
+    await server.start()
+    logger.info("gRPC Chat Server (%s backend) started on port 50051", BACKEND)
+
+    # Shutdown is driven by loop signal handlers rather than a
+    # KeyboardInterrupt: an interrupt raised into asyncio.run() cancels
+    # this coroutine, and an awaited stop() in a cancelled coroutine is
+    # itself cancelled — the grace period never ran. The handler instead
+    # schedules a graceful stop on the live loop: new RPCs are rejected
+    # immediately, in-flight ones get up to 2 seconds (stop(0) cut active
+    # sends off mid-RPC, so clients saw spurious UNAVAILABLE errors
+    # during rolling restarts), then wait_for_termination returns.
+    loop = asyncio.get_running_loop()
+
+    def _request_stop():
+        asyncio.ensure_future(server.stop(grace=2))
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _request_stop)
+        except NotImplementedError:  # event loops without signal support
+            pass
+
+    # Blocks on gRPC's own termination signal — no periodic Python-level
+    # wakeups just to keep the process alive.
+    await server.wait_for_termination()
+    logger.info("gRPC Chat Server stopped.")
+
+
+def _apply_cpu_affinity():
+    """
+    Pins the server process to the CPUs named in CHAT_CPU_AFFINITY (a
+    comma-separated list, e.g. "0,1"). On small hosts this keeps the gRPC
+    threads and the Firestore watch thread from bouncing between cores and
+    fighting whatever else runs on the box. Opt-in: unset means the
+    scheduler decides, and non-Linux platforms without sched_setaffinity
+    are skipped.
+    """
+    spec = os.environ.get("CHAT_CPU_AFFINITY")
+    if not spec or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        cpus = {int(cpu) for cpu in spec.split(",")}
+        os.sched_setaffinity(0, cpus)
+        logger.info("Pinned server process to CPUs %s", sorted(cpus))
+    except (ValueError, OSError) as e:
+        logger.warning("Could not apply CPU affinity %r: %s", spec, e)
+
+
+def _run_worker():
+    """Entry point for one server process: affinity, loop, aio server."""
+    _apply_cpu_affinity()
+    asyncio.run(serve_async())
+
+
 def serve():
     """
-    Starts the gRPC server and initializes Firebase.
+    Starts the gRPC server with the backend selected by CHAT_BACKEND.
+
+    CHAT_PROCESSES (default 1) forks that many worker processes, each
+    running its own event loop and binding port 50051 via SO_REUSEPORT so
+    the kernel load-balances incoming connections. This sidesteps the GIL
+    for CPU-bound protobuf work, but note the caveat for the in-memory
+    backend: each process has its own store and streaming registry, so a
+    message sent through one worker is only streamed to clients connected
+    to that same worker. The Firestore backend has no such split — all
+    workers share the database.
     """
-    initialize_firebase() # Initialize Firebase before starting the server
+    process_count = max(1, int(os.environ.get("CHAT_PROCESSES", "1")))
+    if process_count == 1:
+        _run_worker()
+        return
 
-    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=10))
-    chat_pb2_grpc.add_ChatServiceServicer_to_server(
-        ChatServiceServicer(), server)
-    server.add_insecure_port('[::]:50051') # Listen on all interfaces, port 50051
-    server.start()
-    print("gRPC Chat Server started on port 50051")
+    import multiprocessing
+    if BACKEND != "firestore":
+        logger.warning(
+            "CHAT_PROCESSES=%d with the in-memory backend: each process has "
+            "an isolated message store.", process_count)
+    workers = [multiprocessing.Process(target=_run_worker, daemon=False)
+               for _ in range(process_count)]
+    for worker in workers:
+        worker.start()
+    logger.info("Started %d gRPC server processes on port 50051", process_count)
     try:
-        while True:
-            time.sleep(86400) # Server runs for a day
+        for worker in workers:
+            worker.join()
     except KeyboardInterrupt:
-        server.stop(0)
-        print("gRPC Chat Server stopped.")
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
     serve()
@@ -7,6 +7,7 @@ import json
 import threading
 import queue
 import os
+import zlib
 
 # Import the generated gRPC and protobuf files
 # Ensure these files (chat_pb2.py, chat_pb2_grpc.py) are in the same directory
@@ -34,12 +35,120 @@ except ImportError:
 
 app = Flask(__name__)
 
-# gRPC server address
-GRPC_SERVER_ADDRESS = 'localhost:50051'
+# orjson serializes straight to bytes several times faster than the stdlib
+# json module; fall back to json so the app still runs without it.
+try:
+    import orjson
+
+    def _json_bytes(data):
+        """Serialize one message dict to JSON bytes."""
+        return orjson.dumps(data)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_bytes(data):
+        """Serialize one message dict to JSON bytes."""
+        return json.dumps(data).encode('utf-8')
+
+    _json_loads = json.loads
+
+# The /send_message success body never varies, so it is rendered once; the
+# Response object itself is still built per request (Flask responses carry
+# per-request state and must not be shared).
+_SEND_OK_BODY = b'{"status": "success", "message": "Message sent!"}'
+
+# How many queued messages one SSE event may carry. During a burst the
+# subscriber drains up to this many pre-serialized payloads and sends them
+# as a single JSON-array frame, so the browser pays one event dispatch
+# instead of thirty-two.
+BATCH_MAX = 32
+
+# Upper bound on an SSE subscriber's undelivered-payload queue. A browser
+# that falls this far behind is disconnected (EventSource reconnects on
+# its own) instead of buffering an unbounded backlog in server memory.
+SUBSCRIBER_QUEUE_CAPACITY = 2048
+
+# gRPC server address and HTTP port, overridable per deployment
+GRPC_SERVER_ADDRESS = os.environ.get('CHAT_GRPC_ADDRESS', 'localhost:50051')
+HTTP_PORT = int(os.environ.get('CHAT_HTTP_PORT', '5001'))
+
+# One channel + stub per process. gRPC channels multiplex any number of
+# concurrent RPCs over one HTTP/2 connection and reconnect by themselves,
+# so opening a fresh channel per request just paid the TCP/HTTP2 handshake
+# again on every message. Keepalive pings keep the idle connection warm
+# and detect a dead server. The channel is created lazily on first use
+# rather than at import time: gRPC core is not fork-safe, and under
+# gunicorn with preload_app this module is imported in the master before
+# the workers fork (the gevent shim must also be installed first — see
+# gunicorn.conf.py).
+_CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_permit_without_calls', 1),
+]
+_stub_lock = threading.Lock()
+_SEND_MESSAGE = None
+_STREAM_MESSAGES = None
+
+
+def _ensure_stub():
+    """Creates the shared channel and stub on first use in this process.
+
+    The stub's bound methods are cached as module globals: the send path
+    runs per HTTP request, and a global lookup is cheaper than an
+    attribute walk through the stub each time.
+    """
+    global _SEND_MESSAGE, _STREAM_MESSAGES
+    if _SEND_MESSAGE is None:
+        with _stub_lock:
+            if _SEND_MESSAGE is None:
+                channel = grpc.insecure_channel(GRPC_SERVER_ADDRESS, options=_CHANNEL_OPTIONS)
+                stub = chat_pb2_grpc.ChatServiceStub(channel)
+                _STREAM_MESSAGES = stub.StreamMessages
+                _SEND_MESSAGE = stub.SendMessage  # set last: publishes the stub
+
+
+# Message classes cached as module globals (fork-safe, unlike the channel).
+_CHAT_MESSAGE = chat_pb2.ChatMessage
+_SEND_REQUEST = chat_pb2.SendMessageRequest
+
+# Per-subscriber queues of pre-rendered SSE frames. A single shared queue
+# meant concurrent /stream connections stole messages from each other —
+# each frame was delivered to whichever subscriber happened to dequeue it.
+# Every SSE connection now registers its own queue and the consumer thread
+# broadcasts each frame to all of them.
+_sse_subscribers = {}
+_sse_lock = threading.Lock()
+
+
+def _broadcast_payload(payload):
+    """
+    Delivers one pre-serialized JSON payload to every subscriber. A full
+    queue marks a subscriber too slow to keep; evicting it from the
+    registry ends its /stream response the next time it wakes.
+    """
+    with _sse_lock:
+        subscribers = list(_sse_subscribers.items())
+    for subscriber_id, subscriber_queue in subscribers:
+        try:
+            subscriber_queue.put_nowait(payload)
+        except queue.Full:
+            with _sse_lock:
+                _sse_subscribers.pop(subscriber_id, None)
+            print(f"Dropping slow SSE subscriber {subscriber_id} (queue full)")
+
 
-# Queue to hold new messages received from the gRPC stream
-# This queue will be consumed by the SSE endpoint
-message_queue = queue.Queue()
+def _gzip_stream(frames):
+    """
+    Compress an SSE byte stream incrementally. The compressor is flushed
+    after every frame so each event still reaches the browser immediately;
+    chat JSON is repetitive, so even per-event flushing shrinks it well.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)  # gzip wrapper
+    for frame in frames:
+        chunk = compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if chunk:
+            yield chunk
+    yield compressor.flush()
 
 # Thread to continuously stream messages from the gRPC server
 def grpc_stream_consumer():
@@ -47,16 +156,22 @@ def grpc_stream_consumer():
     Connects to the gRPC server's StreamMessages RPC and
     puts received messages into a queue for the Flask SSE endpoint.
     """
+    _ensure_stub()
     while True:
         try:
-            with grpc.insecure_channel(GRPC_SERVER_ADDRESS) as channel:
-                stub = chat_pb2_grpc.ChatServiceStub(channel)
-                print("Connecting to gRPC server for streaming...")
-                # The StreamMessages RPC returns an iterator
-                for chat_message in stub.StreamMessages(chat_pb2.StreamMessagesRequest()):
-                    # Put the received message into the queue
-                    message_queue.put(chat_message)
-                    # print(f"Queued message: {chat_message.sender}: {chat_message.content}")
+            print("Connecting to gRPC server for streaming...")
+            # The StreamMessages RPC returns an iterator
+            for chat_message in _STREAM_MESSAGES(chat_pb2.StreamMessagesRequest()):
+                # Serialize the message once here, so every subscriber can
+                # reuse the same bytes instead of re-serializing the JSON
+                # per connection. Framing happens in the SSE generator,
+                # which batches queued payloads into array events.
+                data = {
+                    'sender': chat_message.sender,
+                    'content': chat_message.content,
+                    'timestamp': chat_message.timestamp
+                }
+                _broadcast_payload(_json_bytes(data))
         except grpc.RpcError as e:
             print(f"gRPC streaming error: {e}. Retrying in 5 seconds...")
             time.sleep(5) # Wait before retrying connection
@@ -64,9 +179,23 @@ def grpc_stream_consumer():
             print(f"Unexpected error in gRPC stream consumer: {e}. Retrying in 5 seconds...")
             time.sleep(5)
 
-# Start the gRPC stream consumer in a separate thread when the app starts
-# This ensures messages are continuously fetched in the background.
-threading.Thread(target=grpc_stream_consumer, daemon=True).start()
+# The consumer is started explicitly (from __main__ or gunicorn's
+# post_worker_init hook) rather than at import time: under gunicorn with
+# preload_app the module is imported in the master process, and a thread
+# started there would not survive the fork into the workers. Under the
+# gevent worker the hook runs after monkey-patching, so this "thread" is
+# really a greenlet on the worker's hub.
+_consumer_lock = threading.Lock()
+_consumer_thread = None
+
+
+def start_stream_consumer():
+    """Starts the background gRPC stream consumer once per process."""
+    global _consumer_thread
+    with _consumer_lock:
+        if _consumer_thread is None:
+            _consumer_thread = threading.Thread(target=grpc_stream_consumer, daemon=True)
+            _consumer_thread.start()
 
 
 @app.route('/')
@@ -82,7 +211,13 @@ def send_message():
     Handles incoming POST requests to send a chat message.
     It acts as a gRPC client, sending the message to the gRPC server.
     """
-    data = request.get_json()
+    # Parse the raw body with orjson directly: request.get_json() routes
+    # through Flask's slower stdlib-based machinery and caches the result
+    # we would never reuse.
+    try:
+        data = _json_loads(request.get_data(cache=False) or b"{}")
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid JSON body'}), 400
     sender = data.get('sender', 'Anonymous')
     content = data.get('content', '')
 
@@ -90,18 +225,15 @@ def send_message():
         return jsonify({'status': 'error', 'message': 'Message content cannot be empty'}), 400
 
     try:
-        with grpc.insecure_channel(GRPC_SERVER_ADDRESS) as channel:
-            stub = chat_pb2_grpc.ChatServiceStub(channel)
-            # Create a ChatMessage protobuf object
-            chat_message = chat_pb2.ChatMessage(
-                sender=sender,
-                content=content,
-                timestamp=int(time.time()) # Current Unix timestamp
-            )
-            # Create a SendMessageRequest and send it to the gRPC server
-            request_pb = chat_pb2.SendMessageRequest(message=chat_message)
-            stub.SendMessage(request_pb)
-            return jsonify({'status': 'success', 'message': 'Message sent!'})
+        # Create a ChatMessage protobuf object
+        # No client-side timestamp: the server stamps messages on arrival,
+        # which keeps ordering consistent and saves a syscall per request.
+        _ensure_stub()
+        chat_message = _CHAT_MESSAGE(sender=sender, content=content)
+        # Create a SendMessageRequest and send it over the shared channel
+        request_pb = _SEND_REQUEST(message=chat_message)
+        _SEND_MESSAGE(request_pb, timeout=2)
+        return Response(_SEND_OK_BODY, mimetype='application/json')
     except grpc.RpcError as e:
         print(f"gRPC error sending message: {e}")
         return jsonify({'status': 'error', 'message': f'Failed to send message: {e.details()}'}), 500
@@ -116,29 +248,66 @@ def stream_messages():
     It continuously pulls messages from the message_queue and sends them.
     """
     def generate_messages():
-        while True:
-            try:
-                # Get a message from the queue. block=True means it waits until a message is available.
-                # timeout=1 ensures we don't block indefinitely and can check if the client disconnected.
-                chat_message = message_queue.get(block=True, timeout=1)
-                # Format the message as a JSON string and yield it as an SSE event
-                data = {
-                    'sender': chat_message.sender,
-                    'content': chat_message.content,
-                    'timestamp': chat_message.timestamp
-                }
-                yield f"data: {json.dumps(data)}\n\n"
-            except queue.Empty:
-                # No message in the queue, send a heartbeat to keep the connection alive
-                # and allow the browser to detect if the server is still active.
-                yield ":heartbeat\n\n"
-            except Exception as e:
-                print(f"Error in SSE stream: {e}")
-                break # Break the loop if an error occurs
+        subscriber_queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_CAPACITY)
+        subscriber_id = id(subscriber_queue)
+        with _sse_lock:
+            _sse_subscribers[subscriber_id] = subscriber_queue
+        try:
+            while True:
+                with _sse_lock:
+                    evicted = _sse_subscribers.get(subscriber_id) is not subscriber_queue
+                if evicted:
+                    # Dropped by the broadcast as a slow consumer; end the
+                    # response so the browser's EventSource reconnects.
+                    break
+                try:
+                    # Wait for the next payload; timeout=1 ensures we don't
+                    # block indefinitely and can check if the client
+                    # disconnected. Once one arrives, drain whatever else is
+                    # already queued (up to BATCH_MAX) and send the burst as
+                    # a single JSON-array event.
+                    payloads = [subscriber_queue.get(block=True, timeout=1)]
+                    try:
+                        while len(payloads) < BATCH_MAX:
+                            payloads.append(subscriber_queue.get_nowait())
+                    except queue.Empty:
+                        pass
+                    yield b"data: [" + b",".join(payloads) + b"]\n\n"
+                except queue.Empty:
+                    # No message in the queue, send a heartbeat to keep the connection alive
+                    # and allow the browser to detect if the server is still active.
+                    yield b":heartbeat\n\n"
+                except Exception as e:
+                    print(f"Error in SSE stream: {e}")
+                    break # Break the loop if an error occurs
+        finally:
+            with _sse_lock:
+                _sse_subscribers.pop(subscriber_id, None)
 
+    # no-cache stops intermediaries from caching the event stream, and
+    # X-Accel-Buffering tells nginx-style proxies not to buffer it —
+    # without that, events can sit in the proxy instead of reaching the
+    # browser as they happen.
+    headers = {
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'Vary': 'Accept-Encoding',
+    }
+    stream = generate_messages()
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        stream = _gzip_stream(stream)
+        headers['Content-Encoding'] = 'gzip'
     # Set the content type for Server-Sent Events
-    return Response(generate_messages(), mimetype='text/event-stream')
+    return Response(stream, mimetype='text/event-stream', headers=headers)
+
+@app.route('/health')
+def health():
+    """Simple health check endpoint"""
+    return jsonify({'status': 'ok', 'message': 'Flask app is running'})
 
 if __name__ == '__main__':
-    # Run Flask app. In a production environment, use a WSGI server like Gunicorn.
-    app.run(debug=True, port=5001)
+    # Development entry point. In production run gunicorn with the bundled
+    # gunicorn.conf.py instead — the dev server handles one request at a
+    # time, and debug mode roughly halves throughput on top of that.
+    start_stream_consumer()
+    app.run(port=HTTP_PORT)
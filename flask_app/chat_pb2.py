@@ -2,7 +2,7 @@
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # NO CHECKED-IN PROTOBUF GENCODE
 # source: chat.proto
-# Protobuf Python Version: 6.31.0
+# Protobuf Python Version: 7.35.1
 """Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import descriptor_pool as _descriptor_pool
@@ -11,9 +11,9 @@ from google.protobuf import symbol_database as _symbol_database
 from google.protobuf.internal import builder as _builder
 _runtime_version.ValidateProtobufRuntimeVersion(
     _runtime_version.Domain.PUBLIC,
-    6,
-    31,
-    0,
+    7,
+    35,
+    1,
     '',
     'chat.proto'
 )
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nchat.proto\x12\x04\x63hat\"A\n\x0b\x43hatMessage\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\"8\n\x12SendMessageRequest\x12\"\n\x07message\x18\x01 \x01(\x0b\x32\x11.chat.ChatMessage\"\x15\n\x13SendMessageResponse\"\x17\n\x15StreamMessagesRequest\")\n\x18GetMessageHistoryRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\"@\n\x19GetMessageHistoryResponse\x12#\n\x08messages\x18\x01 \x03(\x0b\x32\x11.chat.ChatMessage\"*\n\x14\x44\x65leteMessageRequest\x12\x12\n\nmessage_id\x18\x01 \x01(\t\"9\n\x15\x44\x65leteMessageResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xb5\x02\n\x0b\x43hatService\x12\x42\n\x0bSendMessage\x12\x18.chat.SendMessageRequest\x1a\x19.chat.SendMessageResponse\x12\x42\n\x0eStreamMessages\x12\x1b.chat.StreamMessagesRequest\x1a\x11.chat.ChatMessage0\x01\x12T\n\x11GetMessageHistory\x12\x1e.chat.GetMessageHistoryRequest\x1a\x1f.chat.GetMessageHistoryResponse\x12H\n\rDeleteMessage\x12\x1a.chat.DeleteMessageRequest\x1a\x1b.chat.DeleteMessageResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nchat.proto\x12\x04\x63hat\"A\n\x0b\x43hatMessage\x12\x0e\n\x06sender\x18\x01 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\"8\n\x12SendMessageRequest\x12\"\n\x07message\x18\x01 \x01(\x0b\x32\x11.chat.ChatMessage\")\n\x13SendMessageResponse\x12\x12\n\nmessage_id\x18\x01 \x01(\t\"\x17\n\x15StreamMessagesRequest\")\n\x18GetMessageHistoryRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\"@\n\x19GetMessageHistoryResponse\x12#\n\x08messages\x18\x01 \x03(\x0b\x32\x11.chat.ChatMessage\"*\n\x14\x44\x65leteMessageRequest\x12\x12\n\nmessage_id\x18\x01 \x01(\t\"9\n\x15\x44\x65leteMessageResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t2\xb5\x02\n\x0b\x43hatService\x12\x42\n\x0bSendMessage\x12\x18.chat.SendMessageRequest\x1a\x19.chat.SendMessageResponse\x12\x42\n\x0eStreamMessages\x12\x1b.chat.StreamMessagesRequest\x1a\x11.chat.ChatMessage0\x01\x12T\n\x11GetMessageHistory\x12\x1e.chat.GetMessageHistoryRequest\x1a\x1f.chat.GetMessageHistoryResponse\x12H\n\rDeleteMessage\x12\x1a.chat.DeleteMessageRequest\x1a\x1b.chat.DeleteMessageResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -36,17 +36,17 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_SENDMESSAGEREQUEST']._serialized_start=87
   _globals['_SENDMESSAGEREQUEST']._serialized_end=143
   _globals['_SENDMESSAGERESPONSE']._serialized_start=145
-  _globals['_SENDMESSAGERESPONSE']._serialized_end=166
-  _globals['_STREAMMESSAGESREQUEST']._serialized_start=168
-  _globals['_STREAMMESSAGESREQUEST']._serialized_end=191
-  _globals['_GETMESSAGEHISTORYREQUEST']._serialized_start=193
-  _globals['_GETMESSAGEHISTORYREQUEST']._serialized_end=234
-  _globals['_GETMESSAGEHISTORYRESPONSE']._serialized_start=236
-  _globals['_GETMESSAGEHISTORYRESPONSE']._serialized_end=300
-  _globals['_DELETEMESSAGEREQUEST']._serialized_start=302
-  _globals['_DELETEMESSAGEREQUEST']._serialized_end=344
-  _globals['_DELETEMESSAGERESPONSE']._serialized_start=346
-  _globals['_DELETEMESSAGERESPONSE']._serialized_end=403
-  _globals['_CHATSERVICE']._serialized_start=406
-  _globals['_CHATSERVICE']._serialized_end=715
+  _globals['_SENDMESSAGERESPONSE']._serialized_end=186
+  _globals['_STREAMMESSAGESREQUEST']._serialized_start=188
+  _globals['_STREAMMESSAGESREQUEST']._serialized_end=211
+  _globals['_GETMESSAGEHISTORYREQUEST']._serialized_start=213
+  _globals['_GETMESSAGEHISTORYREQUEST']._serialized_end=254
+  _globals['_GETMESSAGEHISTORYRESPONSE']._serialized_start=256
+  _globals['_GETMESSAGEHISTORYRESPONSE']._serialized_end=320
+  _globals['_DELETEMESSAGEREQUEST']._serialized_start=322
+  _globals['_DELETEMESSAGEREQUEST']._serialized_end=364
+  _globals['_DELETEMESSAGERESPONSE']._serialized_start=366
+  _globals['_DELETEMESSAGERESPONSE']._serialized_end=423
+  _globals['_CHATSERVICE']._serialized_start=426
+  _globals['_CHATSERVICE']._serialized_end=735
 # @@protoc_insertion_point(module_scope)
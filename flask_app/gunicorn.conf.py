@@ -0,0 +1,42 @@
+# flask_app/gunicorn.conf.py
+
+# Production server config:
+#   gunicorn --config gunicorn.conf.py wsgi:application
+#
+# gevent workers keep the long-lived /stream SSE connections cheap — each
+# subscriber is a greenlet, not a blocked OS thread — so one worker can
+# hold thousands of open streams. preload_app imports the app once in the
+# master and shares the code pages with the workers via copy-on-write.
+
+import multiprocessing
+
+bind = "0.0.0.0:5001"
+workers = multiprocessing.cpu_count()
+worker_class = "gevent"
+worker_connections = 1000
+preload_app = True
+
+
+def post_worker_init(worker):
+    # This must be post_worker_init, not post_fork: gunicorn runs
+    # post_fork before GeventWorker.init_process() calls
+    # monkey.patch_all(), so anything done there sees the unpatched
+    # runtime — init_gevent() binds to real OS primitives and the
+    # consumer becomes a real thread whose blocking stream iteration
+    # then parks forever waiting cross-thread on gevent primitives.
+    # Here the worker is fully monkey-patched, so the shim hooks the
+    # patched runtime and the patched threading.Thread makes the
+    # consumer a greenlet on the worker's hub.
+    #
+    # grpcio's blocking calls hold the worker's one OS thread; under
+    # gevent that would freeze every greenlet in the worker until the
+    # call returned, so the gevent compatibility shim must be installed
+    # before the first RPC. The channel itself is created lazily in
+    # app.py, so nothing touches gRPC before this runs.
+    import grpc.experimental.gevent as grpc_gevent
+    grpc_gevent.init_gevent()
+
+    # Background threads do not survive the preload fork, so each worker
+    # starts its own gRPC stream consumer here.
+    from app import start_stream_consumer
+    start_stream_consumer()
@@ -0,0 +1,6 @@
+# flask_app/wsgi.py
+
+# WSGI entry point for production servers:
+#   gunicorn --config gunicorn.conf.py wsgi:application
+
+from app import app as application
@@ -11,6 +11,13 @@ import sys
 
 # Test configuration
 FLASK_URL = "http://127.0.0.1:5001"
+
+# One session for every request: the underlying connection pool keeps the
+# TCP connection to Flask alive across calls instead of paying a fresh
+# handshake per message, and common headers are set once here.
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=16))
+SESSION.headers["Content-Type"] = "application/json"
 TEST_MESSAGES = [
     {"sender": "Alice", "content": "Hello everyone!"},
     {"sender": "Bob", "content": "Hi Alice, how are you?"},
@@ -22,9 +29,8 @@ TEST_MESSAGES = [
 def test_send_message(sender, content):
     """Test sending a message to the chat."""
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{FLASK_URL}/send_message",
-            headers={"Content-Type": "application/json"},
             json={"sender": sender, "content": content},
             timeout=5
         )
@@ -46,7 +52,7 @@ def test_send_message(sender, content):
 def test_homepage():
     """Test if the homepage loads correctly."""
     try:
-        response = requests.get(FLASK_URL, timeout=5)
+        response = SESSION.get(FLASK_URL, timeout=5)
         if response.status_code == 200 and "Real-Time Chat" in response.text:
             print("✅ Homepage loads correctly")
             return True
@@ -61,7 +67,7 @@ def test_sse_stream():
     """Test if the SSE stream is working."""
     print("🔄 Testing SSE stream...")
     try:
-        response = requests.get(f"{FLASK_URL}/stream", stream=True, timeout=10)
+        response = SESSION.get(f"{FLASK_URL}/stream", stream=True, timeout=10)
         if response.status_code == 200:
             # Read a few lines to see if we get heartbeats
             lines = []
@@ -84,6 +90,43 @@ def test_sse_stream():
         print(f"❌ Exception testing SSE: {e}")
         return False
 
+def test_stream_delivery():
+    """Test that a sent message arrives on an open stream exactly once."""
+    print("🔄 Testing exactly-once stream delivery...")
+    marker = f"delivery-check-{time.time_ns()}"
+    hits = []
+
+    def read_stream():
+        try:
+            response = SESSION.get(f"{FLASK_URL}/stream", stream=True, timeout=10)
+            deadline = time.time() + 6
+            # Heartbeats arrive every second, so this loop re-checks the
+            # deadline at least that often even when no messages flow.
+            for line in response.iter_lines(decode_unicode=True):
+                if time.time() > deadline:
+                    break
+                if line and line.startswith("data:"):
+                    hits.extend(m for m in json.loads(line[5:])
+                                if m.get("content") == marker)
+            response.close()
+        except Exception as e:
+            print(f"❌ Exception reading stream: {e}")
+
+    reader = Thread(target=read_stream, daemon=True)
+    reader.start()
+    time.sleep(1.5)  # let the subscriber register before sending
+    if not test_send_message("DeliveryBot", marker):
+        return False
+    reader.join(timeout=10)
+
+    if len(hits) == 1:
+        print("✅ Streamed message arrived exactly once")
+        return True
+    # 0 means the stream is dead; >1 means a reconnect loop is replaying
+    # history to subscribers.
+    print(f"❌ Expected exactly one copy of the test message, got {len(hits)}")
+    return False
+
 def main():
     """Run all tests."""
     print("🚀 Starting realtime chat app tests...")
@@ -108,7 +151,11 @@ def main():
     # Test 3: SSE Stream
     print("\nTest 3: Server-Sent Events stream")
     test_sse_stream()
-    
+
+    # Test 4: Exactly-once delivery on an open stream
+    print("\nTest 4: Stream delivery")
+    test_stream_delivery()
+
     print("\n" + "=" * 50)
     print("🎉 Test suite completed!")
     print("💡 To test the UI, open http://127.0.0.1:5001 in your browser")